@@ -1,21 +1,43 @@
 from typing import Annotated
-from fastapi import Depends
-from fastapi.security import HTTPBasic, HTTPBasicCredentials
+from fastapi import Depends, Header
+from fastapi.security import (
+    HTTPAuthorizationCredentials,
+    HTTPBasic,
+    HTTPBasicCredentials,
+    HTTPBearer,
+)
 
-from app.core.database import SessionDep
+from app.core.database import ReadSessionDep, open_read_session
 from app.models import User
+from app.schemas.auth_schema import AccessTokenClaims
 from app.services.auth_services import (
     AuthFailedError,
     AuthServices,
     InvalidCredentialError,
 )
+from app.services.token_services import TokenServices
+
+security = HTTPBasic(auto_error=False)
+bearer_security = HTTPBearer(auto_error=False)
+
+CredentialsDep = Annotated[HTTPBasicCredentials | None, Depends(security)]
+BearerCredentialsDep = Annotated[
+    HTTPAuthorizationCredentials | None, Depends(bearer_security)
+]
+IdempotencyKeyDep = Annotated[
+    str | None, Header(alias="Idempotency-Key", min_length=1, max_length=255)
+]
 
-security = HTTPBasic()
 
-CredentialsDep = Annotated[HTTPBasicCredentials, Depends(security)]
+# sent with the 401 when no credentials were given, like `HTTPBasic()` does
+basic_challenge = {"WWW-Authenticate": "Basic"}
+basic_or_bearer_challenge = {"WWW-Authenticate": "Basic, Bearer"}
 
 
-def get_current_user(credentials: CredentialsDep, session: SessionDep):
+def get_password_user(credentials: CredentialsDep, session: ReadSessionDep):
+    if credentials is None:
+        raise AuthFailedError(headers=basic_challenge)
+
     auth_service = AuthServices(session)
 
     try:
@@ -31,4 +53,45 @@ def get_current_user(credentials: CredentialsDep, session: SessionDep):
     return user
 
 
+# HTTP Basic only, for the routes that exchange a password for tokens
+PasswordUserDep = Annotated[User, Depends(get_password_user)]
+
+
+def get_current_user_claims(
+    credentials: CredentialsDep, bearer_credentials: BearerCredentialsDep
+):
+    if bearer_credentials is not None:
+        return TokenServices.verify_access_token(bearer_credentials.credentials)
+    if credentials is None:
+        raise AuthFailedError(headers=basic_or_bearer_challenge)
+
+    # the session is only opened for the password check
+    with open_read_session() as session:
+        user = get_password_user(credentials, session)
+    return AccessTokenClaims(user_id=user.id, is_admin=bool(user.is_admin))  # type: ignore
+
+
+# a bearer token is checked without touching the database,
+# use it when the user id and admin flag are enough
+CurrentUserClaimsDep = Annotated[AccessTokenClaims, Depends(get_current_user_claims)]
+
+
+def get_current_user(
+    credentials: CredentialsDep,
+    bearer_credentials: BearerCredentialsDep,
+    session: ReadSessionDep,
+):
+    if bearer_credentials is None:
+        if credentials is None:
+            raise AuthFailedError(headers=basic_or_bearer_challenge)
+        return get_password_user(credentials, session)
+
+    claims = TokenServices.verify_access_token(bearer_credentials.credentials)
+    user = session.get(User, claims.user_id)
+    if user is None:
+        raise AuthFailedError()
+    return user
+
+
+# accepts a bearer access token and falls back to HTTP Basic
 CurrentUserDep = Annotated[User, Depends(get_current_user)]
@@ -1,25 +1,55 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 
-from app.api.deps import CurrentUserDep
-from app.core.database import SessionDep
+from app.api.deps import CurrentUserDep, IdempotencyKeyDep
+from app.core.database import WriteSessionDep
 from app.schemas.cart_schema import CartItemCreate, CartItemRead
 from app.services.cart_services import CartServices
+from app.services.idempotency_services import IdempotencyServices
 
 
 router = APIRouter(prefix="/cart", tags=["cart"])
 
 
 @router.post("/", response_model=CartItemRead)
-def add_to_cart(
-    cart_item: CartItemCreate, session: SessionDep, current_user: CurrentUserDep
+async def add_to_cart(
+    cart_item: CartItemCreate,
+    session: WriteSessionDep,
+    current_user: CurrentUserDep,
+    idempotency_key: IdempotencyKeyDep = None,
 ):
     cart_service = CartServices(session, current_user)
-    new_cart_item = cart_service.add_to_cart(cart_item)
+
+    # the service and the lazy loaded relationships query the db synchronously
+    def add_and_read_cart_item():
+        return CartItemRead.model_validate(cart_service.add_to_cart(cart_item))
+
+    if idempotency_key is None:
+        return await run_in_threadpool(add_and_read_cart_item)
+
+    idempotency_service = IdempotencyServices(
+        scope="cart",
+        user_id=current_user.id,  # type: ignore
+        idempotency_key=idempotency_key,
+        request_body=cart_item.model_dump_json(),
+    )
+    stored_response = await idempotency_service.acquire()
+    if stored_response is not None:
+        return stored_response
+
+    try:
+        new_cart_item = await run_in_threadpool(add_and_read_cart_item)
+    except Exception:
+        # failed requests are not stored so the client can retry with the same key
+        await idempotency_service.release()
+        raise
+
+    await idempotency_service.save_response(new_cart_item.model_dump_json())
     return new_cart_item
 
 
 @router.delete("/clear/")
-def clear_cart(session: SessionDep, current_user: CurrentUserDep):
+def clear_cart(session: WriteSessionDep, current_user: CurrentUserDep):
     cart_service = CartServices(session, current_user)
     is_cleared = cart_service.clear_cart()
     if not is_cleared:
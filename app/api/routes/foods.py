@@ -1,38 +1,84 @@
+from datetime import datetime, timedelta, timezone
 from fastapi import APIRouter, HTTPException, Query, Request
-from sqlmodel import select
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 
-from app.api.deps import CurrentUserDep
-from app.core.database import SessionDep
-from app.models import Food, User
-from app.schemas.foods_schema import FoodCreate
+from app.api.deps import CurrentUserClaimsDep
+from app.core.database import ReadSessionDep, WriteSessionDep
+from app.core.responses import FastJSONResponse, fetch_rows_as_dicts, select_columns
+from app.models import Food
+from app.schemas.foods_schema import (
+    FoodCreate,
+    FoodSalesStats,
+    FoodSortOption,
+    SalesPeriod,
+)
 from app.schemas.pagination import PaginationResponse
+from app.services.sales_services import SalesServices
 
 
 router = APIRouter(prefix="/foods", tags=["foods"])
 
 
-@router.get("/")
+@router.get(
+    "/",
+    response_model=PaginationResponse[Food],
+    response_class=FastJSONResponse,
+)
 async def get_foods(
     request: Request,
-    session: SessionDep,
+    session: ReadSessionDep,
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
-) -> PaginationResponse[Food]:
-
+    sort: FoodSortOption | None = None,
+):
+    # rows come straight from the food table, so they are projected to dicts
+    # and rendered as-is instead of being validated again by the response model
     base_url = request.base_url
-    foods = session.exec(select(Food).offset(offset).limit(limit)).all()
+    statement = select_columns(Food).offset(offset).limit(limit)
+    if sort == FoodSortOption.POPULAR:
+        statement = SalesServices.order_by_popularity(statement)
+    foods = fetch_rows_as_dicts(session, statement)
     no_of_foods = len(foods)
+    sort_query = f"&sort={sort.value}" if sort is not None else ""
     next = (
-        f"{base_url}?limit={10}&offset={offset + 1}" if no_of_foods == limit else None
+        f"{base_url}?limit={10}&offset={offset + 1}{sort_query}"
+        if no_of_foods == limit
+        else None
+    )
+    prev = (
+        f"{base_url}?limit={10}&offset={(offset - 1)}{sort_query}"
+        if offset > 0
+        else None
     )
-    prev = f"{base_url}?limit={10}&offset={(offset - 1)}" if offset > 0 else None
-    return PaginationResponse(next=next, prev=prev, count=len(foods), result=foods)
+    return FastJSONResponse(
+        {"next": next, "prev": prev, "count": no_of_foods, "result": foods}
+    )
+
+
+@router.get(
+    "/stats/",
+    response_model=list[FoodSalesStats],
+    response_class=FastJSONResponse,
+)
+async def get_food_stats(
+    session: ReadSessionDep,
+    current_user: CurrentUserClaimsDep,
+    period: SalesPeriod = SalesPeriod.DAY,
+    since: datetime | None = None,
+    limit: int = Query(10, ge=1, le=100),
+):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Only admins can view food stats")
+
+    if since is None:
+        since = datetime.now(timezone.utc) - timedelta(days=7)
+    # the service already returns the projected rows, see `get_foods`
+    return FastJSONResponse(SalesServices(session).get_food_sales(period, since, limit))
 
 
 @router.post("/")
 async def create_food(
-    food: FoodCreate, session: SessionDep, current_user: CurrentUserDep
+    food: FoodCreate, session: WriteSessionDep, current_user: CurrentUserClaimsDep
 ) -> Food:
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Only admins can create foods")
@@ -2,16 +2,19 @@ import json
 from typing import Annotated
 from fastapi import APIRouter, BackgroundTasks, Cookie, Response
 
-from app.core.database import SessionDep
-from app.schemas.auth_schema import OTP
+from app.api.deps import PasswordUserDep
+from app.core.database import ReadSessionDep, WriteSessionDep
+from app.models import User
+from app.schemas.auth_schema import OTP, RefreshToken, TokenPair
 from app.schemas.users_schema import UserPublic, UserCreate
-from app.services.auth_services import AuthServices
+from app.services.auth_services import AuthFailedError, AuthServices
 from app.services.email_services import EmailServices
 from app.services.otp_services import (
     OTPServices,
     OTPValidationAttemptsExceededError,
     OTPVerificationError,
 )
+from app.services.token_services import TokenServices
 from app.core.utils import is_prod_enviroment
 
 router = APIRouter(tags=["auth"])
@@ -20,12 +23,12 @@ router = APIRouter(tags=["auth"])
 @router.post("/signup/")
 async def signup(
     user: UserCreate,
-    session: SessionDep,
+    session: ReadSessionDep,
     response: Response,
     background_tasks: BackgroundTasks,
 ):
     auth_service = AuthServices(session)
-    auth_service.verify_ceridentials(user.email, user.phone_number)
+    await auth_service.verify_ceridentials(user.email, user.phone_number)
     otp, otp_hash = OTPServices.generate_otp()
     session_id = await auth_service.create_user_verification_session(
         user=user, otp_hash=otp_hash, session_duration=OTPServices.OTP_EXPIRY_TIME
@@ -50,7 +53,7 @@ async def signup(
 async def verify_otp(
     otp: OTP,
     signup_session_id: Annotated[str, Cookie()],
-    session: SessionDep,
+    session: WriteSessionDep,
     response: Response,
 ):
     auth_service = AuthServices(session)
@@ -70,3 +73,23 @@ async def verify_otp(
     response.delete_cookie(key="signup_session_id")
     await auth_service.delete_user_verification_session(signup_session_id)
     return user
+
+
+@router.post("/login/", response_model=TokenPair)
+async def login(current_user: PasswordUserDep):
+    return await TokenServices.create_token_pair(current_user)
+
+
+@router.post("/token/refresh/", response_model=TokenPair)
+async def refresh_token(token: RefreshToken, session: ReadSessionDep):
+    user_id = await TokenServices.use_refresh_token(token.refresh_token)
+    user = session.get(User, user_id)
+    if user is None:
+        raise AuthFailedError()
+    return await TokenServices.create_token_pair(user)
+
+
+@router.post("/logout/")
+async def logout(token: RefreshToken):
+    await TokenServices.use_refresh_token(token.refresh_token)
+    return {"message": "Logged out successfully"}
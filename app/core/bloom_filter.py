@@ -0,0 +1,63 @@
+import hashlib
+from typing import Iterable
+
+from .cache import cache
+
+
+class BloomFilter:
+    """Bloom filter stored in a redis bitmap.
+
+    `might_contain` never returns a false negative once the filter has been
+    loaded, so a `False` answer can be trusted without asking the database.
+    Until it is loaded, or when redis lost the bitmap or its ready marker
+    (restart, flush, eviction), every lookup answers `True`.
+    """
+
+    def __init__(self, key: str, size: int = 2**24, no_of_hashes: int = 7):
+        self.key = key
+        self.ready_key = f"{key}:ready"
+        self.size = size
+        self.no_of_hashes = no_of_hashes
+        self.is_ready = False
+
+    def get_offsets(self, value: str) -> list[int]:
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first_hash = int.from_bytes(digest[:8])
+        second_hash = int.from_bytes(digest[8:]) | 1
+        return [
+            (first_hash + i * second_hash) % self.size for i in range(self.no_of_hashes)
+        ]
+
+    async def add(self, values: Iterable[str]):
+        offsets = [offset for value in values for offset in self.get_offsets(value)]
+        if offsets:
+            await cache.set_bits(self.key, offsets)
+
+    async def might_contain(self, values: list[str]) -> list[bool]:
+        if not self.is_ready:
+            return [True] * len(values)
+
+        bits = await cache.get_bits(
+            self.key,
+            [offset for value in values for offset in self.get_offsets(value)],
+            required_keys=(self.key, self.ready_key),
+        )
+        if bits is None:
+            return [True] * len(values)
+        return [
+            all(bits[i * self.no_of_hashes : (i + 1) * self.no_of_hashes])
+            for i in range(len(values))
+        ]
+
+    async def load(self, values: Iterable[str], batch_size: int = 1000):
+        """Fill the filter once, workers that start later reuse the loaded bitmap."""
+        if await cache.get(self.ready_key) is None:
+            batch = []
+            for value in values:
+                batch.append(value)
+                if len(batch) == batch_size:
+                    await self.add(batch)
+                    batch = []
+            await self.add(batch)
+            await cache.set(self.ready_key, 1, expiry_time=None)
+        self.is_ready = True
@@ -19,6 +19,9 @@ class Cache:
     async def set(self, key: str, value, expiry_time=60):
         await self.redis.set(key, value, ex=expiry_time)
 
+    async def set_if_not_exists(self, key: str, value, expiry_time=60) -> bool:
+        return bool(await self.redis.set(key, value, ex=expiry_time, nx=True))
+
     async def set_hash(
         self,
         key: str,
@@ -47,11 +50,34 @@ class Cache:
     async def get(self, key):
         return await self.redis.get(key)
 
+    async def get_and_delete(self, key):
+        return await self.redis.getdel(key)
+
     async def delete(self, key):
         await self.redis.delete(key)
 
     async def set_expire_time(self, key: str, amount: int):
         await self.redis.expire(key, amount)
 
+    async def set_bits(self, key: str, offsets):
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for offset in offsets:
+                pipe.setbit(key, offset, 1)
+            await pipe.execute()
+
+    async def get_bits(self, key: str, offsets, required_keys=()):
+        """Read the bits, or return None when any of `required_keys` is missing."""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            if required_keys:
+                pipe.exists(*required_keys)
+            for offset in offsets:
+                pipe.getbit(key, offset)
+            results = await pipe.execute()
+        if not required_keys:
+            return results
+        if results[0] != len(required_keys):
+            return None
+        return results[1:]
+
 
 cache = Cache()
@@ -1,13 +1,106 @@
-from fastapi import Depends
+import base64
+import itertools
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from fastapi import Depends, Request, Response
+from redis.exceptions import RedisError
+from sqlalchemy import Engine, event, inspect
+from sqlalchemy.exc import OperationalError
 from typing_extensions import Annotated
 from sqlmodel import SQLModel, create_engine, Session
 
+import orjson
+
+from .cache import cache
+from .utils import is_prod_enviroment, load_enviroment_variables
+
+load_enviroment_variables()
+
+logger = logging.getLogger(__name__)
+
 DATABASE_URL = "sqlite:///./test.db"
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# comma separated, e.g. "sqlite:///file:replica.db?mode=ro&uri=true"
+READ_DATABASE_URLS = [
+    url.strip() for url in os.getenv("READ_DATABASE_URLS", "").split(",") if url.strip()
+]
+READ_AFTER_WRITE_TIME = int(os.getenv("READ_AFTER_WRITE_TIME", "5"))
+
+
+def create_database_engine(url: str, **kwargs) -> Engine:
+    connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+    return create_engine(url, connect_args=connect_args, **kwargs)
+
+
+engine = create_database_engine(DATABASE_URL)
+
+
+class ReadReplicas:
+    """Round robin over the read engines, skipping the ones that recently failed."""
+
+    UNHEALTHY_TIME = 30
+
+    def __init__(self, urls: list[str]):
+        self.engines = [create_database_engine(url, pool_pre_ping=True) for url in urls]
+        self.unhealthy_until = [0.0] * len(self.engines)
+        self.counter = itertools.count()
+        for read_engine in self.engines:
+            event.listen(read_engine, "handle_error", self.handle_error)
+
+    def get_engine(self) -> Engine | None:
+        """The next healthy engine in the rotation."""
+        now = time.monotonic()
+        start = next(self.counter)
+        for i in range(len(self.engines)):
+            index = (start + i) % len(self.engines)
+            if self.unhealthy_until[index] <= now:
+                return self.engines[index]
+        return None
+
+    def mark_unhealthy(self, index: int):
+        self.unhealthy_until[index] = time.monotonic() + self.UNHEALTHY_TIME
+
+    def handle_error(self, context):
+        # sessions connect on their first query, so a replica that is down fails
+        # that query and is skipped by the sessions opened after it
+        if context.is_pre_ping or not isinstance(
+            context.sqlalchemy_exception, OperationalError
+        ):
+            return
+        self.mark_unhealthy(self.engines.index(context.engine))
+
+
+read_replicas = ReadReplicas(READ_DATABASE_URLS)
+
+
+def add_missing_columns():
+    """`create_all` doesn't alter existing tables, later columns and indexes go here."""
+    cart_item_columns = {
+        column["name"] for column in inspect(engine).get_columns("cartitem")
+    }
+    if "updated_at" not in cart_item_columns:
+        # existing items count as updated now so they aren't purged right away
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")
+        with engine.begin() as connection:
+            connection.exec_driver_sql(
+                "ALTER TABLE cartitem "
+                f"ADD COLUMN updated_at DATETIME NOT NULL DEFAULT '{now}'"
+            )
+            connection.exec_driver_sql(
+                "CREATE INDEX IF NOT EXISTS ix_cartitem_updated_at "
+                "ON cartitem (updated_at)"
+            )
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "CREATE INDEX IF NOT EXISTS ix_cartitem_buyer_activity "
+            "ON cartitem (buyer_id, updated_at)"
+        )
 
 
 def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
+    add_missing_columns()
 
 
 def get_session():
@@ -15,4 +108,106 @@ def get_session():
         yield session
 
 
+def get_request_user_id(request: Request) -> str | None:
+    """The user id sent in the Authorization header, the credentials aren't checked.
+
+    Only used to keep a user's reads on the primary after a write, so like the
+    cookie a wrong id can at worst send reads to the primary.
+    """
+    scheme, _, credentials = request.headers.get("authorization", "").partition(" ")
+    try:
+        if scheme.lower() == "basic":
+            return base64.b64decode(credentials).decode().partition(":")[0] or None
+        if scheme.lower() == "bearer":
+            body = credentials.partition(".")[0]
+            payload = orjson.loads(
+                base64.urlsafe_b64decode(body + "=" * (-len(body) % 4))
+            )
+            return str(payload["sub"])
+    except (ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+async def remember_write(request: Request):
+    # runs after the write session is closed but before the response is sent,
+    # so the user's next request already reads from the primary
+    yield
+    user_id = get_request_user_id(request)
+    if not (
+        read_replicas.engines
+        and user_id
+        and getattr(request.state, "has_committed", False)
+    ):
+        return
+    try:
+        await cache.set(f"read_primary:{user_id}", 1, expiry_time=READ_AFTER_WRITE_TIME)
+    except RedisError:
+        logger.warning("Could not keep the reads of user %s on the primary", user_id)
+
+
+def get_write_session(
+    request: Request,
+    response: Response,
+    _: Annotated[None, Depends(remember_write, scope="function")],
+):
+    request.state.has_committed = False
+    with Session(engine) as session:
+
+        # send this client's reads to the primary until the replicas catch up,
+        # by user id through redis and by cookie for clients without one
+        @event.listens_for(session, "after_commit")
+        def set_read_after_write_cookie(session):
+            request.state.has_committed = True
+            response.set_cookie(
+                key="read_primary_until",
+                value=str(int(time.time()) + READ_AFTER_WRITE_TIME),
+                httponly=True,
+                max_age=READ_AFTER_WRITE_TIME,
+                secure=is_prod_enviroment,
+                samesite="none" if is_prod_enviroment else "lax",
+            )
+
+        yield session
+
+
+def has_recently_written(request: Request) -> bool:
+    try:
+        return int(request.cookies.get("read_primary_until", 0)) > time.time()
+    except ValueError:
+        return False
+
+
+async def should_read_primary(request: Request) -> bool:
+    if not read_replicas.engines or has_recently_written(request):
+        return True
+
+    user_id = get_request_user_id(request)
+    if user_id is None:
+        return False
+    try:
+        return await cache.get(f"read_primary:{user_id}") is not None
+    except RedisError:
+        return False
+
+
+def open_read_session(read_primary: bool = False) -> Session:
+    """A session on the next healthy replica, or on the primary.
+
+    It only connects on its first query, so a request that doesn't query never
+    checks out a connection.
+    """
+    read_engine = None if read_primary else read_replicas.get_engine()
+    return Session(read_engine or engine)
+
+
+def get_read_session(
+    read_primary: Annotated[bool, Depends(should_read_primary)],
+):
+    with open_read_session(read_primary) as session:
+        yield session
+
+
 SessionDep = Annotated[Session, Depends(get_session)]
+ReadSessionDep = Annotated[Session, Depends(get_read_session)]
+WriteSessionDep = Annotated[Session, Depends(get_write_session, scope="function")]
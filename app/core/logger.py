@@ -0,0 +1,212 @@
+import logging
+import os
+import queue
+import re
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+import orjson
+
+from .utils import load_enviroment_variables
+
+load_enviroment_variables()
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+request_id_var: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+# attributes every LogRecord has, anything else was passed through `extra`
+reserved_record_attributes = set(
+    logging.LogRecord("", 0, "", 0, "", None, None).__dict__
+) | {"message", "asctime", "request_id"}
+
+sensitive_keys = ("password", "otp", "token", "secret", "authorization", "api_key")
+# a key on its own or as a part of a `_`/`-` separated name (access_token,
+# secret_key), but not inside another word (hotpot)
+sensitive_key_names = "|".join(key.replace("_", "[_-]") for key in sensitive_keys)
+sensitive_key_pattern = (
+    rf"(?<![a-z0-9])(?:[a-z0-9]+[_-])*(?:{sensitive_key_names})"
+    r"(?:[_-][a-z0-9]+)*(?![a-z0-9])"
+)
+# the value ends at a quote or separator so the rest of the JSON stays intact,
+# after a bare space only values with a digit count ("OTP 123456", not "OTP sent")
+sensitive_pattern = re.compile(
+    rf"(?i)({sensitive_key_pattern})"
+    r"([\"']?\s*[=:]\s*[\"']?|\s+is\s+|\s+(?=[^\s\"',;&}]*\d))"
+    r"(bearer\s+|basic\s+)?[^\s\"',;&}]+"
+)
+sensitive_name_pattern = re.compile(rf"(?i){sensitive_key_pattern}")
+bearer_pattern = re.compile(r"(?i)\b(bearer|basic)\s+[\w\-.~+/=]+")
+
+
+def redact(value: str) -> str:
+    """
+    >>> redact('access_token=abc.def refresh_token: xyz {"password": "x"}')
+    'access_token=[REDACTED] refresh_token: [REDACTED] {"password": "[REDACTED]"}'
+    >>> redact("Sent OTP 123456 to a@b.co, Authorization: Bearer abc")
+    'Sent OTP [REDACTED] to a@b.co, Authorization: [REDACTED]'
+    >>> redact("X-API-Key: k, secret_key=zz")
+    'X-API-Key: [REDACTED], secret_key=[REDACTED]'
+    >>> redact("hotpot: spicy, OTP sent, tokenizer=x, password reset")
+    'hotpot: spicy, OTP sent, tokenizer=x, password reset'
+    """
+    value = sensitive_pattern.sub(r"\1\2[REDACTED]", value)
+    return bearer_pattern.sub(r"\1 [REDACTED]", value)
+
+
+class RequestIdFilter(logging.Filter):
+    """Copies the request id of the current context onto the record.
+
+    Has to run in the thread that logs, before the record is queued.
+    """
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Lets through at most `limit` error records per message per `interval`.
+
+    The number of dropped records is added to the next record that gets through.
+    """
+
+    def __init__(self, limit: int = 10, interval: float = 60):
+        super().__init__()
+        self.limit = limit
+        self.interval = interval
+        self.windows: dict[tuple[str, str], list] = {}
+
+    def filter(self, record):
+        if record.levelno < logging.ERROR:
+            return True
+
+        now = time.monotonic()
+        key = (record.name, str(record.msg))
+        window = self.windows.get(key)
+        if window is None or now - window[0] >= self.interval:
+            window = self.windows[key] = [now, 0, window[2] if window else 0]
+
+        if window[1] >= self.limit:
+            window[2] += 1
+            return False
+
+        window[1] += 1
+        if window[2]:
+            record.suppressed = window[2]
+            window[2] = 0
+        return True
+
+
+class RedactingFilter(logging.Filter):
+    def filter(self, record):
+        record.msg = redact(record.getMessage())
+        record.args = None
+        for key, value in record.__dict__.items():
+            if key in reserved_record_attributes:
+                continue
+            if sensitive_name_pattern.search(key):
+                record.__dict__[key] = "[REDACTED]"
+            elif isinstance(value, str):
+                record.__dict__[key] = redact(value)
+        if record.exc_text:
+            record.exc_text = redact(record.exc_text)
+        return True
+
+
+class StructuredQueueHandler(QueueHandler):
+    """Queues records with their message merged but their fields left intact.
+
+    The default `QueueHandler.prepare` folds the traceback into the message,
+    here it is kept in `exc_text` so it ends up in its own JSON field. It is the
+    only handler of the `app` logger, so the record is updated without a copy.
+    """
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        log = {
+            "timestamp": datetime.fromtimestamp(
+                record.created, timezone.utc
+            ).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        for key, value in record.__dict__.items():
+            if key not in reserved_record_attributes:
+                log[key] = value
+        if record.exc_text:
+            log["exception"] = record.exc_text
+        return orjson.dumps(log, default=str).decode()
+
+
+def setup_logging(stream=sys.stdout) -> QueueListener:
+    """Send the `app` loggers through a queue to a JSON handler on another thread.
+
+    Request threads only put records on the queue, the listener thread does the
+    redaction, formatting and writing. Call `stop()` on the listener at shutdown.
+    """
+    log_queue = queue.SimpleQueue()
+
+    queue_handler = StructuredQueueHandler(log_queue)
+    queue_handler.addFilter(RequestIdFilter())
+    queue_handler.addFilter(SamplingFilter())
+
+    stream_handler = logging.StreamHandler(stream)
+    stream_handler.addFilter(RedactingFilter())
+    stream_handler.setFormatter(JsonFormatter())
+
+    logger = logging.getLogger("app")
+    logger.handlers = [queue_handler]
+    logger.setLevel(LOG_LEVEL)
+    logger.propagate = False
+
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+class RequestIdMiddleware:
+    """Gives every request an id, reusing the client's `X-Request-ID` if sent."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-request-id", request_id.encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
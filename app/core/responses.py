@@ -0,0 +1,36 @@
+from typing import Any, Sequence
+
+import orjson
+from fastapi.responses import JSONResponse
+from sqlalchemy import Column
+from sqlmodel import Session, SQLModel, select
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson.
+
+    Meant for content that is already made of plain python types (dicts,
+    lists, str, int, datetime...), so it skips pydantic validation and
+    `jsonable_encoder` entirely.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def get_columns(model: type[SQLModel]) -> tuple[Column, ...]:
+    return tuple(model.__table__.columns)  # type: ignore
+
+
+def select_columns(model: type[SQLModel]):
+    """Select the model's columns as plain values instead of ORM instances."""
+    return select(*get_columns(model))
+
+
+def fetch_rows_as_dicts(session: Session, statement) -> Sequence[dict[str, Any]]:
+    """Run a column select and return each row as a plain dict.
+
+    No ORM instance is built for the rows, so relationships are never loaded
+    and nothing is added to the session identity map.
+    """
+    return [dict(row) for row in session.exec(statement).mappings()]  # type: ignore
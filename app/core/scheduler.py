@@ -0,0 +1,76 @@
+import asyncio
+import logging
+import time
+from typing import Callable
+
+from .cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+class Scheduler:
+    """Runs sync jobs periodically in a worker thread.
+
+    Every run takes a redis lock for most of the job interval, so when several
+    app workers run the scheduler only one of them executes each run.
+    Jobs return the number of rows they affected.
+    """
+
+    FIRST_RUN_DELAY = 30
+
+    def __init__(self):
+        self.jobs: list[tuple[str, Callable[[], int], int]] = []
+        self.tasks: list[asyncio.Task] = []
+        self.reports: dict[str, dict] = {}
+
+    def add_job(self, name: str, job: Callable[[], int], interval: int):
+        self.jobs.append((name, job, interval))
+
+    def start(self):
+        for name, job, interval in self.jobs:
+            self.tasks.append(
+                asyncio.create_task(self.run_periodically(name, job, interval))
+            )
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    async def run_periodically(self, name: str, job: Callable[[], int], interval: int):
+        # first run shortly after startup, the lock stops other workers repeating it
+        await asyncio.sleep(self.FIRST_RUN_DELAY)
+        while True:
+            try:
+                await self.run_job(name, job, lock_time=max(int(interval * 0.9), 1))
+            except Exception:
+                logger.exception("Scheduled job %s could not run", name)
+            await asyncio.sleep(interval)
+
+    async def run_job(self, name: str, job: Callable[[], int], lock_time: int):
+        if not await cache.set_if_not_exists(
+            f"scheduler_lock:{name}", 1, expiry_time=lock_time
+        ):
+            return None
+
+        start_time = time.perf_counter()
+        try:
+            rows_affected = await asyncio.to_thread(job)
+        except Exception:
+            logger.exception("Scheduled job %s failed", name)
+            return None
+
+        duration = time.perf_counter() - start_time
+        self.reports[name] = {
+            "rows_affected": rows_affected,
+            "duration": duration,
+            "finished_at": time.time(),
+        }
+        logger.info(
+            "Scheduled job %s affected %d rows in %.3fs", name, rows_affected, duration
+        )
+        return self.reports[name]
+
+
+scheduler = Scheduler()
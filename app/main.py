@@ -1,21 +1,40 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from sqlmodel import Session
 from app.api.routes import cart, foods, users
 from app.core.cache import cache
-from app.core.database import create_db_and_tables
+from app.core.database import create_db_and_tables, engine
+from app.core.logger import RequestIdMiddleware, setup_logging
+from app.core.scheduler import scheduler
+from app.services.auth_services import AuthServices
+from app.services.maintenance_services import add_maintenance_jobs
+from app.services.sales_services import SalesServices
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    log_listener = setup_logging()
+    create_db_and_tables()
+    cache.connect()
+    with Session(engine) as session:
+        await AuthServices(session).load_credentials_filter()
+        SalesServices(session).create_missing_sales_totals()
+
+    scheduler.start()
+    yield
+    await scheduler.stop()
+    log_listener.stop()
+
+
+add_maintenance_jobs(scheduler)
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"]
 )
+app.add_middleware(RequestIdMiddleware)
 app.include_router(foods.router)
 app.include_router(users.router)
 app.include_router(cart.router)
-
-
-@app.on_event("startup")  # type: ignore
-async def startup_event():
-    create_db_and_tables()
-    cache.connect()
@@ -1,6 +1,7 @@
 from datetime import datetime, timezone
 from enum import Enum
 from pydantic import EmailStr
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel, Session
 from typing import Optional
 
@@ -110,6 +111,11 @@ class Food(DBModelBase, BaseFood, table=True):
 
 
 class CartItem(DBModelBase, BaseCartItem, table=True):
+    __table_args__ = (
+        # the idle cart purge groups by buyer and deletes each buyer's items
+        Index("ix_cartitem_buyer_activity", "buyer_id", "updated_at"),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     food_id: int = Field(foreign_key="food.id")
     buyer_id: Optional[int] = Field(default=None, foreign_key="user.id")
@@ -124,6 +130,9 @@ class CartItem(DBModelBase, BaseCartItem, table=True):
     extra_side: list[Food] = Relationship(
         back_populates="cart_extra_side_link", link_model=CartItemExtraSideFoodLink
     )
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc), index=True
+    )
 
 
 class OrderItem(DBModelBase, table=True):
@@ -174,3 +183,28 @@ class Order(DBModelBase, BaseOrder, table=True):
     food_link: list["OrderItem"] = Relationship(back_populates="order")
     status: OrderStatus = Field(default=OrderStatus.PENDING)
     ordered_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+## Sales aggregate models, kept up to date when order items are inserted
+class BaseFoodSales(SQLModel):
+    order_count: int = Field(default=0)
+    quantity_sold: int = Field(default=0)
+    revenue: int = Field(default=0)
+
+
+class FoodSalesTotal(BaseFoodSales, table=True):
+    __table_args__ = (
+        Index("ix_foodsalestotal_popularity", "quantity_sold", "food_id"),
+    )
+
+    food_id: int = Field(foreign_key="food.id", primary_key=True)
+
+
+class FoodSalesHourly(BaseFoodSales, table=True):
+    period_start: datetime = Field(primary_key=True)
+    food_id: int = Field(foreign_key="food.id", primary_key=True)
+
+
+class FoodSalesDaily(BaseFoodSales, table=True):
+    period_start: datetime = Field(primary_key=True)
+    food_id: int = Field(foreign_key="food.id", primary_key=True)
@@ -10,3 +10,19 @@ class SignupSessionData(TypedDict):
     user: str
     attempts: int
     otp_hash: str
+
+
+class AccessTokenClaims(BaseModel):
+    user_id: int
+    is_admin: bool
+
+
+class RefreshToken(BaseModel):
+    refresh_token: str
+
+
+class TokenPair(BaseModel):
+    access_token: str
+    refresh_token: str
+    token_type: str = "bearer"
+    expires_in: int
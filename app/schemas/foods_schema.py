@@ -1,5 +1,25 @@
+from enum import Enum
+from pydantic import BaseModel
+
 from app.models import BaseFood
 
 
 class FoodCreate(BaseFood):
     pass
+
+
+class FoodSortOption(str, Enum):
+    POPULAR = "popular"
+
+
+class SalesPeriod(str, Enum):
+    HOUR = "hour"
+    DAY = "day"
+
+
+class FoodSalesStats(BaseModel):
+    food_id: int
+    name: str
+    order_count: int
+    quantity_sold: int
+    revenue: int
@@ -1,22 +1,42 @@
+import os
 import secrets
 from fastapi import HTTPException
 from pydantic import EmailStr
-from sqlmodel import select
+from sqlmodel import or_, select
 from argon2 import PasswordHasher
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
 from app.core.database import SessionDep
 from app.models import User
 from app.schemas.auth_schema import SignupSessionData
+from app.core.bloom_filter import BloomFilter
 from app.core.cache import cache
+from app.core.utils import load_enviroment_variables
 from app.schemas.users_schema import UserCreate
 
+load_enviroment_variables()
+
 ph = PasswordHasher()
 
+# lets signups with new emails and phone numbers skip the database lookup
+credentials_filter = (
+    BloomFilter("bloom_filter:user_credentials")
+    if os.getenv("USE_CREDENTIALS_BLOOM_FILTER") == "true"
+    else None
+)
+
+
+def get_credential_filter_values(email: str, phone_number: str) -> list[str]:
+    return [f"email:{email}", f"phone_number:{phone_number}"]
+
 
 class AuthFailedError(HTTPException):
-    def __init__(self):
-        super().__init__(status_code=401, detail="Invalid Authentication credentials")
+    def __init__(self, headers: dict[str, str] | None = None):
+        super().__init__(
+            status_code=401,
+            detail="Invalid Authentication credentials",
+            headers=headers,
+        )
 
 
 class InvalidCredentialError(HTTPException):
@@ -28,15 +48,25 @@ class AuthServices:
     def __init__(self, db: SessionDep):
         self.db = db
 
-    def verify_ceridentials(self, email: EmailStr, phone_number: str):
-        is_email_in_use = (
-            self.db.exec(select(User.id).where(User.email == email)).first() is not None
-        )
-        is_phone_number_in_use = (
-            self.db.exec(
-                select(User.id).where(User.phone_number == phone_number)
-            ).first()
-            is not None
+    async def verify_ceridentials(self, email: EmailStr, phone_number: str):
+        if credentials_filter is not None and not any(
+            await credentials_filter.might_contain(
+                get_credential_filter_values(email, phone_number)
+            )
+        ):
+            return
+
+        self.check_credentials_in_use(email, phone_number)
+
+    def check_credentials_in_use(self, email: EmailStr, phone_number: str):
+        conflicting_users = self.db.exec(
+            select(User.email, User.phone_number)
+            .where(or_(User.email == email, User.phone_number == phone_number))
+            .limit(2)
+        ).all()
+        is_email_in_use = any(user.email == email for user in conflicting_users)
+        is_phone_number_in_use = any(
+            user.phone_number == phone_number for user in conflicting_users
         )
         if is_email_in_use:
             raise HTTPException(status_code=409, detail="This email is already in use")
@@ -45,6 +75,19 @@ class AuthServices:
                 status_code=409, detail="This phone number is already in use"
             )
 
+    async def load_credentials_filter(self):
+        if credentials_filter is None:
+            return
+
+        users = self.db.exec(
+            select(User.email, User.phone_number).execution_options(yield_per=1000)
+        )
+        await credentials_filter.load(
+            value
+            for user in users
+            for value in get_credential_filter_values(user.email, user.phone_number)
+        )
+
     async def create_user_verification_session(
         self, user: UserCreate, otp_hash: str, session_duration: int
     ):
@@ -84,10 +127,15 @@ class AuthServices:
 
     async def create_user(self, user_data: dict) -> User:
         try:
-            self.verify_ceridentials(user_data["email"], user_data["phone_number"])
+            # right before the insert, so the filter is not trusted here
+            self.check_credentials_in_use(user_data["email"], user_data["phone_number"])
             user = User.model_validate(user_data)
             user.password = self.hash_password(user.password)
             user.save(self.db)
+            if credentials_filter is not None:
+                await credentials_filter.add(
+                    get_credential_filter_values(user.email, user.phone_number)
+                )
             return user
         except IntegrityError as e:
             self.db.rollback()
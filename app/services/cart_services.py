@@ -1,3 +1,5 @@
+import logging
+from datetime import datetime, timezone
 from typing import cast
 from fastapi import HTTPException
 from sqlalchemy import ColumnElement, exc
@@ -5,6 +7,8 @@ from sqlmodel import Session, select, delete
 from app.models import CartItem, Food, User
 from app.schemas.cart_schema import CartItemCreate
 
+logger = logging.getLogger(__name__)
+
 
 class CartServices:
     def __init__(self, db: Session, user: User) -> None:
@@ -45,6 +49,7 @@ class CartServices:
             )
             if cart_item_in_db:
                 cart_item_in_db.quantity += cart_item.quantity
+                cart_item_in_db.updated_at = datetime.now(timezone.utc)
                 cart_item_in_db.save(self.db)
                 return cart_item_in_db
 
@@ -58,20 +63,20 @@ class CartServices:
             return db_cart_item
 
         except exc.IntegrityError as e:
-            print(f"Integrity error: {e}")
+            logger.warning("Integrity error while adding to cart: %s", e)
             self.db.rollback()
             raise HTTPException(
                 status_code=409,
                 detail="The new cart item is conflicting with another in the db",
             )
-        except exc.SQLAlchemyError as e:
+        except exc.SQLAlchemyError:
             self.db.rollback()
-            print(f"Database error: {e}")
+            logger.exception("Database error while adding to cart")
             raise HTTPException(
                 status_code=500, detail="Something went wrong at our end"
             )
-        except Exception as e:
-            print(f"Error fetching cart: {e}")
+        except Exception:
+            logger.exception("Error adding to cart")
             raise HTTPException(
                 status_code=500, detail="Something went wrong at our end"
             )
@@ -91,8 +96,8 @@ class CartServices:
             raise HTTPException(
                 status_code=500, detail="Something went wrong at our end"
             )
-        except Exception as e:
-            print(f"Error fetching cart: {e}")
+        except Exception:
+            logger.exception("Error fetching cart")
             return []
 
     def clear_cart(self):
@@ -107,6 +112,6 @@ class CartServices:
             raise HTTPException(
                 status_code=500, detail="Something went wrong at our end"
             )
-        except Exception as e:
-            print(f"Error clearing cart: {e}")
+        except Exception:
+            logger.exception("Error clearing cart")
             return False
@@ -1,4 +1,5 @@
 from pydantic import EmailStr
+import logging
 import smtplib
 import os
 from email.mime.text import MIMEText
@@ -8,6 +9,8 @@ from app.core.utils import load_enviroment_variables
 
 load_enviroment_variables()
 
+logger = logging.getLogger(__name__)
+
 
 class EmailServices:
     @classmethod
@@ -25,7 +28,7 @@ class EmailServices:
         smtp_port = int(os.getenv("SMTP_PORT", "587"))
 
         if not sender_email or not sender_password:
-            print("SMTP credentials not configured")
+            logger.warning("SMTP credentials not configured")
             return False
 
         try:
@@ -45,8 +48,8 @@ class EmailServices:
                 server.sendmail(sender_email, [to], message.as_string())
 
             return True
-        except Exception as e:
-            print(f"unable to send email due to {e}")
+        except Exception:
+            logger.exception("Unable to send email")
             return False
 
     @classmethod
@@ -0,0 +1,91 @@
+import asyncio
+import hashlib
+
+from fastapi import HTTPException, Response
+
+from app.core.cache import cache
+
+
+class IdempotencyKeyInUseError(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=409,
+            detail="A request with this Idempotency-Key is still being processed",
+        )
+
+
+class IdempotencyKeyReusedError(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=422,
+            detail="This Idempotency-Key was already used with a different request",
+        )
+
+
+class IdempotencyServices:
+    KEY_EXPIRY_TIME = 24 * 60 * 60
+    LOCK_EXPIRY_TIME = 30
+    MAX_WAIT_TIME = 10
+    POLL_INTERVAL = 0.1
+
+    def __init__(
+        self, *, scope: str, user_id: int, idempotency_key: str, request_body: str
+    ):
+        self.key = f"idempotency:{scope}:{user_id}:{idempotency_key}"
+        self.lock_key = f"{self.key}:lock"
+        self.fingerprint = hashlib.sha256(request_body.encode()).hexdigest()
+
+    async def get_stored_response(self) -> Response | None:
+        stored_response = await cache.get_hash(self.key)
+        if not stored_response:
+            return None
+        if stored_response["fingerprint"] != self.fingerprint:
+            raise IdempotencyKeyReusedError()
+
+        return Response(
+            content=stored_response["content"],
+            status_code=int(stored_response["status_code"]),
+            media_type="application/json",
+            headers={"Idempotent-Replayed": "true"},
+        )
+
+    async def acquire(self) -> Response | None:
+        """Take ownership of the key, or return the response to replay.
+
+        When another request holds the key, wait for it to finish and replay its
+        response instead of running the operation a second time.
+        """
+        waited_time = 0.0
+        while True:
+            stored_response = await self.get_stored_response()
+            if stored_response is not None:
+                return stored_response
+
+            if await cache.set_if_not_exists(
+                self.lock_key, 1, expiry_time=self.LOCK_EXPIRY_TIME
+            ):
+                # the original request may have finished right before the lock was taken
+                stored_response = await self.get_stored_response()
+                if stored_response is not None:
+                    await self.release()
+                return stored_response
+
+            if waited_time >= self.MAX_WAIT_TIME:
+                raise IdempotencyKeyInUseError()
+            await asyncio.sleep(self.POLL_INTERVAL)
+            waited_time += self.POLL_INTERVAL
+
+    async def save_response(self, content: str, status_code: int = 200):
+        await cache.set_hash(
+            self.key,
+            mapping={
+                "content": content,
+                "status_code": status_code,
+                "fingerprint": self.fingerprint,
+            },
+            expiry_time=self.KEY_EXPIRY_TIME,
+        )
+        await self.release()
+
+    async def release(self):
+        await cache.delete(self.lock_key)
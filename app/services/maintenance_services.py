@@ -0,0 +1,135 @@
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Sequence
+
+from sqlalchemy import func
+from sqlmodel import Session, delete, select
+
+from app.core.database import engine
+from app.core.scheduler import Scheduler
+from app.core.utils import load_enviroment_variables
+from app.models import CartItem, CartItemExtraSideFoodLink, CartItemSideFoodLink
+
+load_enviroment_variables()
+
+CART_IDLE_TIME = int(os.getenv("CART_IDLE_TIME", str(7 * 24 * 60 * 60)))
+MAINTENANCE_BATCH_SIZE = int(os.getenv("MAINTENANCE_BATCH_SIZE", "500"))
+
+cart_link_models = (CartItemSideFoodLink, CartItemExtraSideFoodLink)
+
+
+class MaintenanceServices:
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def delete_cart_items(self, cart_item_ids: Sequence[int]):
+        for link_model in cart_link_models:
+            self.db.exec(
+                delete(link_model).where(
+                    link_model.cart_item_id.in_(cart_item_ids)  # type: ignore
+                )
+            )
+        self.db.exec(
+            delete(CartItem).where(CartItem.id.in_(cart_item_ids))  # type: ignore
+        )
+        self.db.commit()
+
+    def purge_idle_carts(self, idle_time: timedelta, batch_size: int) -> int:
+        """Delete the carts of users who have not touched them for `idle_time`."""
+        cutoff = datetime.now(timezone.utc) - idle_time
+        # found once per run, ix_cartitem_buyer_activity answers it without
+        # reading the table
+        idle_buyer_ids = self.db.exec(
+            select(CartItem.buyer_id)
+            .where(CartItem.buyer_id.is_not(None))  # type: ignore
+            .group_by(CartItem.buyer_id)  # type: ignore
+            .having(func.max(CartItem.updated_at) < cutoff)
+        ).all()
+
+        no_of_deleted_items = 0
+        for start in range(0, len(idle_buyer_ids), batch_size):
+            buyer_ids = idle_buyer_ids[start : start + batch_size]
+            while True:
+                # items added while the purge runs are newer than the cutoff
+                cart_item_ids = self.db.exec(
+                    select(CartItem.id)
+                    .where(
+                        CartItem.buyer_id.in_(buyer_ids),  # type: ignore
+                        CartItem.updated_at < cutoff,
+                    )
+                    .limit(batch_size)
+                ).all()
+                if not cart_item_ids:
+                    break
+
+                self.delete_cart_items(cart_item_ids)  # type: ignore
+                no_of_deleted_items += len(cart_item_ids)
+        return no_of_deleted_items
+
+    def delete_orphaned_cart_links(self, batch_size: int) -> int:
+        """Delete side food links whose cart item no longer exists."""
+        no_of_deleted_links = 0
+        for link_model in cart_link_models:
+            while True:
+                orphaned_cart_item_ids = (
+                    select(link_model.cart_item_id)
+                    .where(
+                        link_model.cart_item_id.not_in(  # type: ignore
+                            select(CartItem.id)
+                        )
+                    )
+                    .distinct()
+                    .limit(batch_size)
+                )
+                result = self.db.exec(
+                    delete(link_model).where(
+                        link_model.cart_item_id.in_(  # type: ignore
+                            orphaned_cart_item_ids
+                        )
+                    )
+                )
+                self.db.commit()
+                if not result.rowcount:
+                    break
+                no_of_deleted_links += result.rowcount
+        return no_of_deleted_links
+
+    def optimize_database(self) -> int:
+        """Refresh the query planner statistics and reclaim free pages on SQLite."""
+        if self.db.get_bind().dialect.name != "sqlite":
+            return 0
+
+        # VACUUM can't run inside a transaction
+        with engine.connect().execution_options(
+            isolation_level="AUTOCOMMIT"
+        ) as connection:
+            connection.exec_driver_sql("ANALYZE")
+            connection.exec_driver_sql("VACUUM")
+        return 0
+
+
+def purge_idle_carts_job():
+    with Session(engine) as session:
+        return MaintenanceServices(session).purge_idle_carts(
+            timedelta(seconds=CART_IDLE_TIME), MAINTENANCE_BATCH_SIZE
+        )
+
+
+def delete_orphaned_cart_links_job():
+    with Session(engine) as session:
+        return MaintenanceServices(session).delete_orphaned_cart_links(
+            MAINTENANCE_BATCH_SIZE
+        )
+
+
+def optimize_database_job():
+    with Session(engine) as session:
+        return MaintenanceServices(session).optimize_database()
+
+
+def add_maintenance_jobs(scheduler: Scheduler):
+    scheduler.add_job("purge_idle_carts", purge_idle_carts_job, interval=60 * 60)
+    scheduler.add_job(
+        "delete_orphaned_cart_links", delete_orphaned_cart_links_job, interval=60 * 60
+    )
+    scheduler.add_job("optimize_database", optimize_database_job, interval=24 * 60 * 60)
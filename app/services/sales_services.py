@@ -0,0 +1,150 @@
+from datetime import datetime, timezone
+from typing import Any, Sequence
+
+from sqlalchemy import Connection, delete, desc, event, exists, func, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select
+from sqlmodel.sql.expression import SelectOfScalar
+
+from app.core.responses import fetch_rows_as_dicts
+from app.models import (
+    Food,
+    FoodSalesDaily,
+    FoodSalesHourly,
+    FoodSalesTotal,
+    OrderItem,
+)
+from app.schemas.foods_schema import SalesPeriod
+
+sales_fields = ("order_count", "quantity_sold", "revenue")
+
+
+def get_dialect_insert(connection: Connection):
+    return (
+        postgresql.insert if connection.dialect.name == "postgresql" else sqlite.insert
+    )
+
+
+def add_food_sales(
+    connection: Connection,
+    model: type[FoodSalesTotal | FoodSalesHourly | FoodSalesDaily],
+    values: dict,
+):
+    """Insert a sales row, or add the values to it when it already exists."""
+    table = model.__table__  # type: ignore
+    statement = get_dialect_insert(connection)(table).values(**values)
+    statement = statement.on_conflict_do_update(
+        index_elements=[column.name for column in table.primary_key],
+        set_={
+            field: table.c[field] + statement.excluded[field] for field in sales_fields
+        },
+    )
+    connection.execute(statement)
+
+
+@event.listens_for(Food, "after_insert")
+def create_food_sales_total(mapper, connection: Connection, food: Food):
+    # sqlite reuses the id of a deleted food, reset a total it may have left
+    table = FoodSalesTotal.__table__  # type: ignore
+    statement = get_dialect_insert(connection)(table).values(food_id=food.id)
+    connection.execute(
+        statement.on_conflict_do_update(
+            index_elements=["food_id"], set_={field: 0 for field in sales_fields}
+        )
+    )
+
+
+@event.listens_for(Food, "before_delete")
+def delete_food_sales(mapper, connection: Connection, food: Food):
+    # before the food row goes, the aggregates reference it
+    for model in (FoodSalesTotal, FoodSalesHourly, FoodSalesDaily):
+        table = model.__table__  # type: ignore
+        connection.execute(delete(table).where(table.c.food_id == food.id))
+
+
+@event.listens_for(OrderItem, "after_insert")
+def record_order_item_sales(mapper, connection: Connection, order_item: OrderItem):
+    # runs inside the flush, so the aggregates are committed with the order itself
+    ordered_at = order_item.ordered_at.astimezone(timezone.utc)
+    hour_start = ordered_at.replace(minute=0, second=0, microsecond=0)
+    sales = {
+        "food_id": order_item.food_id,
+        "order_count": 1,
+        "quantity_sold": order_item.quantity,
+        "revenue": order_item.price_at_order * order_item.quantity,
+    }
+    add_food_sales(connection, FoodSalesTotal, sales)
+    add_food_sales(connection, FoodSalesHourly, {"period_start": hour_start, **sales})
+    add_food_sales(
+        connection,
+        FoodSalesDaily,
+        {"period_start": hour_start.replace(hour=0), **sales},
+    )
+
+
+class SalesServices:
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    @classmethod
+    def order_by_popularity(cls, statement: SelectOfScalar) -> SelectOfScalar:
+        # walks ix_foodsalestotal_popularity backwards and stops after the page
+        return statement.join(
+            FoodSalesTotal, FoodSalesTotal.food_id == Food.id  # type: ignore
+        ).order_by(desc(FoodSalesTotal.quantity_sold), desc(FoodSalesTotal.food_id))
+
+    def create_missing_sales_totals(self):
+        """Add empty sales totals for foods created before the totals existed."""
+        self.db.exec(
+            insert(FoodSalesTotal).from_select(  # type: ignore
+                ["food_id"],
+                select(Food.id).where(
+                    ~exists().where(FoodSalesTotal.food_id == Food.id)
+                ),
+            )
+        )
+        self.db.commit()
+
+    def get_food_sales(
+        self, period: SalesPeriod, since: datetime, limit: int
+    ) -> Sequence[dict[str, Any]]:
+        """Sales per food since the start of the bucket containing `since`.
+
+        Rows are plain dicts shaped like `FoodSalesStats`.
+        """
+        model = FoodSalesHourly if period == SalesPeriod.HOUR else FoodSalesDaily
+        since = (
+            since.astimezone(timezone.utc)
+            if since.tzinfo
+            else since.replace(tzinfo=timezone.utc)
+        )
+        # include the whole bucket that contains `since`
+        since = since.replace(minute=0, second=0, microsecond=0)
+        if period == SalesPeriod.DAY:
+            since = since.replace(hour=0)
+
+        sales = (
+            select(
+                model.food_id,
+                func.sum(model.order_count).label("order_count"),
+                func.sum(model.quantity_sold).label("quantity_sold"),
+                func.sum(model.revenue).label("revenue"),
+            )
+            .where(model.period_start >= since)
+            .group_by(model.food_id)  # type: ignore
+            .order_by(desc("revenue"))
+            .limit(limit)
+            .subquery()
+        )
+        statement = (
+            select(
+                sales.c.food_id,
+                Food.name,
+                sales.c.order_count,
+                sales.c.quantity_sold,
+                sales.c.revenue,
+            )
+            .join(sales, sales.c.food_id == Food.id)  # type: ignore
+            .order_by(desc(sales.c.revenue))
+        )
+        return fetch_rows_as_dicts(self.db, statement)
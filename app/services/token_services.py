@@ -0,0 +1,118 @@
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import time
+
+import orjson
+
+from app.core.cache import cache
+from app.core.utils import load_enviroment_variables
+from app.models import User
+from app.schemas.auth_schema import AccessTokenClaims, TokenPair
+from app.services.auth_services import InvalidCredentialError
+
+load_enviroment_variables()
+
+token_secret_key = os.getenv("TOKEN_SECRET_KEY")
+if token_secret_key is None:
+    raise ValueError("TOKEN_SECRET_KEY environment variable is not set")
+
+secret_key = token_secret_key.encode()
+
+
+def b64_encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def b64_decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+class TokenServices:
+    ACCESS_TOKEN_EXPIRY_TIME = 900
+    REFRESH_TOKEN_EXPIRY_TIME = 7 * 24 * 60 * 60
+
+    @classmethod
+    def sign(cls, payload: dict) -> str:
+        body = b64_encode(orjson.dumps(payload))
+        signature = hmac.new(secret_key, body.encode(), hashlib.sha256).digest()
+        return f"{body}.{b64_encode(signature)}"
+
+    @classmethod
+    def decode(cls, token: str, token_type: str) -> dict:
+        """Check the signature, type and expiry of a token and return its payload."""
+        body, _, signature = token.partition(".")
+        expected_signature = hmac.new(
+            secret_key, body.encode(), hashlib.sha256
+        ).digest()
+        try:
+            is_signature_valid = hmac.compare_digest(
+                b64_decode(signature), expected_signature
+            )
+            payload = orjson.loads(b64_decode(body)) if is_signature_valid else None
+        except (ValueError, orjson.JSONDecodeError):
+            payload = None
+
+        if (
+            not isinstance(payload, dict)
+            or payload.get("typ") != token_type
+            or payload.get("exp", 0) < time.time()
+        ):
+            raise InvalidCredentialError(f"{token_type} token")
+        return payload
+
+    @classmethod
+    def create_access_token(cls, user: User) -> str:
+        return cls.sign(
+            {
+                "sub": user.id,
+                "adm": bool(user.is_admin),
+                "typ": "access",
+                "exp": int(time.time()) + cls.ACCESS_TOKEN_EXPIRY_TIME,
+            }
+        )
+
+    @classmethod
+    def verify_access_token(cls, token: str) -> AccessTokenClaims:
+        payload = cls.decode(token, "access")
+        return AccessTokenClaims(user_id=payload["sub"], is_admin=payload["adm"])
+
+    @classmethod
+    async def create_refresh_token(cls, user: User) -> str:
+        token_id = secrets.token_urlsafe(16)
+        await cache.set(
+            f"refresh_token:{token_id}",
+            user.id,
+            expiry_time=cls.REFRESH_TOKEN_EXPIRY_TIME,
+        )
+        return cls.sign(
+            {
+                "sub": user.id,
+                "jti": token_id,
+                "typ": "refresh",
+                "exp": int(time.time()) + cls.REFRESH_TOKEN_EXPIRY_TIME,
+            }
+        )
+
+    @classmethod
+    async def use_refresh_token(cls, token: str) -> int:
+        """Revoke a refresh token and return the id of the user it was issued to.
+
+        Refresh tokens are single use, a token that was already used or revoked
+        is rejected.
+        """
+        payload = cls.decode(token, "refresh")
+        stored_user_id = await cache.get_and_delete(f"refresh_token:{payload['jti']}")
+        if stored_user_id is None or int(stored_user_id) != payload["sub"]:
+            raise InvalidCredentialError("refresh token")
+        return payload["sub"]
+
+    @classmethod
+    async def create_token_pair(cls, user: User) -> TokenPair:
+        return TokenPair(
+            access_token=cls.create_access_token(user),
+            refresh_token=await cls.create_refresh_token(user),
+            expires_in=cls.ACCESS_TOKEN_EXPIRY_TIME,
+        )
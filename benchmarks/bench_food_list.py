@@ -0,0 +1,69 @@
+"""Per-page serialization cost of `GET /foods/`.
+
+Compares the previous path (ORM rows -> response model validation ->
+`jsonable_encoder` -> `JSONResponse`) with the projected dict rows rendered by
+`FastJSONResponse`.
+
+Run with: python -m benchmarks.bench_food_list
+"""
+
+import timeit
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.core.responses import FastJSONResponse, fetch_rows_as_dicts, select_columns
+from app.models import Food
+from app.schemas.pagination import PaginationResponse
+
+PAGE_SIZE = 100
+ROUNDS = 200
+
+engine = create_engine("sqlite://")
+SQLModel.metadata.create_all(engine)
+
+with Session(engine) as session:
+    session.add_all(
+        Food(
+            name=f"Food {i}",
+            description="Smoky party jollof rice with fried plantain",
+            price=2500 + i,
+            image_url=f"https://example.com/foods/{i}.png",
+            category="rice",
+            available_quatity=20,
+        )
+        for i in range(PAGE_SIZE)
+    )
+    session.commit()
+
+response_model = PaginationResponse[Food]
+
+
+def model_path(session: Session):
+    foods = session.exec(select(Food).limit(PAGE_SIZE)).all()
+    page = PaginationResponse(next=None, prev=None, count=len(foods), result=foods)
+    validated = response_model.model_validate(page.model_dump())
+    return JSONResponse(jsonable_encoder(validated)).body
+
+
+def projected_path(session: Session):
+    foods = fetch_rows_as_dicts(session, select_columns(Food).limit(PAGE_SIZE))
+    return FastJSONResponse(
+        {"next": None, "prev": None, "count": len(foods), "result": foods}
+    ).body
+
+
+def bench(name, func):
+    with Session(engine) as session:
+        func(session)
+        seconds = min(timeit.repeat(lambda: func(session), number=ROUNDS, repeat=5))
+    print(f"{name:<20} {seconds / ROUNDS * 1000:8.3f} ms/page")
+    return seconds
+
+
+if __name__ == "__main__":
+    print(f"{PAGE_SIZE} foods per page, best of 5 x {ROUNDS} rounds")
+    before = bench("model + encoder", model_path)
+    after = bench("projected + orjson", projected_path)
+    print(f"{"speedup":<20} {before / after:8.2f}x")
@@ -0,0 +1,83 @@
+"""Per-request logging overhead on the request thread.
+
+Each simulated request sets a request id and emits two log records. Compares
+`print()`, a JSON handler writing synchronously, and the queued setup used by
+the app where the JSON formatting and writing happen on the listener thread.
+
+Every variant runs against /dev/null (pure CPU cost) and against a stream that
+takes 0.2ms per write, like stdout piped to a slow log collector.
+
+Run with: python -m benchmarks.bench_logging
+"""
+
+import io
+import logging
+import os
+import sys
+import time
+import timeit
+from contextlib import redirect_stdout
+
+from app.core.logger import (
+    JsonFormatter,
+    RedactingFilter,
+    RequestIdFilter,
+    request_id_var,
+    setup_logging,
+)
+
+ROUNDS = 2000
+
+
+class SlowStream(io.TextIOBase):
+    def write(self, text):
+        time.sleep(0.0002)
+        return len(text)
+
+
+def print_request():
+    print("Adding food 12 to cart for user 7")
+    print("Integrity error: UNIQUE constraint failed: cartitem.id")
+
+
+def make_log_request(logger: logging.Logger):
+    def log_request():
+        token = request_id_var.set("4bf92f3577b34da6a3ce929d0e0e4736")
+        logger.info("Adding food %s to cart", 12, extra={"user_id": 7})
+        logger.warning("Integrity error: %s", "UNIQUE constraint failed: cartitem.id")
+        request_id_var.reset(token)
+
+    return log_request
+
+
+def sync_logger(stream):
+    handler = logging.StreamHandler(stream)
+    handler.addFilter(RequestIdFilter())
+    handler.addFilter(RedactingFilter())
+    handler.setFormatter(JsonFormatter())
+    logger = logging.getLogger("bench.sync")
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+
+def bench(name, func):
+    seconds = min(timeit.repeat(func, number=ROUNDS, repeat=5))
+    print(f"  {name:<20} {seconds / ROUNDS * 1e6:8.2f} us/request", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    print(f"2 records per request, best of 5 x {ROUNDS} rounds", file=sys.stderr)
+    for stream_name, stream in (
+        ("/dev/null", open(os.devnull, "w")),
+        ("slow stream", SlowStream()),
+    ):
+        print(stream_name, file=sys.stderr)
+        with redirect_stdout(stream):
+            bench("print", print_request)
+        bench("sync json handler", make_log_request(sync_logger(stream)))
+
+        listener = setup_logging(stream)
+        bench("queued json handler", make_log_request(logging.getLogger("app.bench")))
+        listener.stop()